@@ -1,18 +1,28 @@
 import streamlit as st
-import pdfplumber
+import pymupdf
 import docx
-import pytesseract
+import ahocorasick
+from tesserocr import PyTessBaseAPI, PSM
 from PIL import Image
+from lxml import etree
 import re
 import io
-import json
-
+import os
+import posixpath
+import threading
+import zipfile
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
 # =====================================================
 # STREAMLIT CONFIG
@@ -56,90 +66,235 @@ FIELD_KEYS = {
     "Selection Process": "selection_process",
 }
 
-EMPTY_SCHEMA = {v: "" for v in FIELD_KEYS.values()}
+# Precomputed (label, key) pairs for every render loop, and a read-only
+# blank record that callers copy with dict(EMPTY_SCHEMA).
+FIELD_PAIRS = tuple((label, FIELD_KEYS[label]) for label in TEMPLATE_FIELDS)
+EMPTY_SCHEMA = MappingProxyType({v: "" for v in FIELD_KEYS.values()})
+
+# Fields edited with a text_area instead of a single-line text_input
+MULTILINE_FIELDS = frozenset(
+    {"Roles & Responsibilities", "Skills", "Selection Process"}
+)
 
 # =====================================================
 # LOAD LOCAL OPEN-SOURCE LLM (COMPLETION ONLY)
 # =====================================================
+# Loaded on first use rather than at import: the UI renders before the
+# weights are read, and uploads the regex layers fully cover never pay for
+# them. st.cache_resource shares the one instance across sessions.
 @st.cache_resource
 def load_llm():
     tokenizer = AutoTokenizer.from_pretrained("google/flan-t5-base")
-    model = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-base")
+    model = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-base").eval()
+    if torch.cuda.is_available():
+        return tokenizer, model.to("cuda")
+
+    # Leave one core for Streamlit itself; the rest go to intra-op GEMMs
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) - 1))
+    # int8 weights for every Linear layer: ~4x less memory traffic per token
+    model = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
     return tokenizer, model
 
-tokenizer, llm_model = load_llm()
-
 # =====================================================
 # OCR + TEXT EXTRACTION
 # =====================================================
-def extract_text(file):
+# 200 DPI greyscale is plenty for printed body text; pages that still come
+# back nearly empty (tiny fonts) are retried at 300 DPI.
+OCR_RESOLUTION = 200
+OCR_FALLBACK_RESOLUTION = 300
+MIN_PAGE_CHARS = 100
+
+# libtesseract runs in-process; an API handle is not thread-safe, so each
+# worker thread keeps its own and reuses the loaded language data. Both the
+# pool and the thread-local live in the resource cache: a module-level
+# threading.local would be replaced on every Streamlit rerun, and every
+# pooled thread would then reload its language data.
+@st.cache_resource
+def ocr_pool():
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+@st.cache_resource
+def tesseract_apis():
+    return threading.local()
+
+def ocr_page(apis, image):
+    api = getattr(apis, "api", None)
+    if api is None:
+        api = apis.api = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK)
+    api.SetImage(image)
+    return api.GetUTF8Text()
+
+# A rasterized A4 page is ~4 MB at 200 DPI greyscale; OCR a batch at a time
+# so a long scan never holds every bitmap in memory at once.
+OCR_BATCH_PAGES = 2 * (os.cpu_count() or 1)
+
+def ocr_pages(pdf, page_indexes, resolution, pool):
+    # MuPDF documents are not thread-safe, so rasterize here and only fan
+    # the tesseract calls out to worker threads.
+    ocr = partial(ocr_page, tesseract_apis())
+    results = {}
+    for start in range(0, len(page_indexes), OCR_BATCH_PAGES):
+        batch = page_indexes[start:start + OCR_BATCH_PAGES]
+        images = []
+        for i in batch:
+            pix = pdf[i].get_pixmap(dpi=resolution, colorspace=pymupdf.csGRAY)
+            images.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+        results.update(zip(batch, pool.map(ocr, images)))
+    return results
+
+# Reading text only needs the main document part; skip python-docx's object
+# model (it is still used to write the DOCX output). Mirrors python-docx 1.2's
+# Paragraph.text: direct runs and hyperlink runs, page/column breaks as "".
+# Uploads are untrusted: like python-docx, never expand entities, so a
+# crafted <!ENTITY x SYSTEM "file:///..."> can't inline server files.
+DOCX_XML_PARSER = etree.XMLParser(resolve_entities=False)
+OPC_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY_PARAGRAPH = f"{W_NS}body/{W_NS}p"
+W_RUN = f"{W_NS}r"
+W_HYPERLINK = f"{W_NS}hyperlink"
+W_BR = f"{W_NS}br"
+W_BR_TYPE = f"{W_NS}type"
+W_RUN_TEXT = {
+    f"{W_NS}t": None,
+    f"{W_NS}tab": "\t",
+    f"{W_NS}ptab": "\t",
+    f"{W_NS}cr": "\n",
+    f"{W_NS}noBreakHyphen": "-",
+}
+
+def docx_run_text(run):
+    parts = []
+    for el in run:
+        if el.tag == W_BR:
+            if el.get(W_BR_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif el.tag in W_RUN_TEXT:
+            text = W_RUN_TEXT[el.tag]
+            parts.append((el.text or "") if text is None else text)
+    return "".join(parts)
+
+# The OPC spec doesn't fix the main part's name; find it through the
+# package's officeDocument relationship (transitional or strict URI).
+def docx_main_part(z):
+    rels = etree.fromstring(z.read("_rels/.rels"), DOCX_XML_PARSER)
+    for rel in rels.iterfind(OPC_RELATIONSHIP):
+        if rel.get("Type", "").endswith("/officeDocument") and rel.get("TargetMode") != "External":
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    raise KeyError("no officeDocument relationship in _rels/.rels")
+
+def extract_docx_text(file_bytes):
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as z:
+        root = etree.fromstring(z.read(docx_main_part(z)), DOCX_XML_PARSER)
+
+    paragraphs = []
+    for p in root.iterfind(W_BODY_PARAGRAPH):
+        runs = []
+        for child in p:
+            if child.tag == W_RUN:
+                runs.append(docx_run_text(child))
+            elif child.tag == W_HYPERLINK:
+                runs.extend(docx_run_text(r) for r in child.iterfind(W_RUN))
+        paragraphs.append("".join(runs))
+    return "\n".join(paragraphs)
+
+# Streamlit reruns the whole script on every widget interaction; the
+# deterministic stages below are memoized on their inputs so only a new
+# upload (or new text) pays for OCR, rules and LLM again.
+@st.cache_data(show_spinner=False, max_entries=16)
+def extract_text(file_bytes, mime):
     text = ""
 
-    if file.type == "application/pdf":
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted and len(extracted.strip()) > 100:
-                    text += extracted + "\n"
+    if mime == "application/pdf":
+        with pymupdf.open(stream=file_bytes, filetype="pdf") as pdf:
+            pages = []
+            scans = []
+            for i, page in enumerate(pdf):
+                extracted = page.get_text("text")
+                if len(extracted.strip()) > MIN_PAGE_CHARS:
+                    pages.append(extracted)
                 else:
-                    image = page.to_image(resolution=300).original
-                    ocr_text = pytesseract.image_to_string(
-                        image, config="--psm 6"
-                    )
-                    text += ocr_text + "\n"
+                    pages.append("")
+                    scans.append(i)
 
-    elif file.type.endswith("wordprocessingml.document"):
-        doc = docx.Document(file)
-        text = "\n".join(p.text for p in doc.paragraphs)
+            if scans:
+                pool = ocr_pool()
+                ocr = ocr_pages(pdf, scans, OCR_RESOLUTION, pool)
+                retry = [i for i in scans if len(ocr[i].strip()) < MIN_PAGE_CHARS]
+                if retry:
+                    ocr.update(ocr_pages(pdf, retry, OCR_FALLBACK_RESOLUTION, pool))
+                for i, ocr_text in ocr.items():
+                    pages[i] = ocr_text
 
-    elif file.type == "text/plain":
-        text = file.read().decode("utf-8")
+        text = "\n".join(pages)
 
-    return re.sub(r"\n{2,}", "\n", text).strip()
+    elif mime.endswith("wordprocessingml.document"):
+        text = extract_docx_text(file_bytes)
+
+    elif mime == "text/plain":
+        text = file_bytes.decode("utf-8")
+
+    # Drop the empty lines between newline runs; same result as collapsing
+    # \n{2,} to \n, minus the regex engine.
+    return "\n".join(filter(None, text.split("\n"))).strip()
 
 # =====================================================
 # RULE-BASED EXTRACTION (PRIMARY)
 # =====================================================
+# Header keywords are tested in priority order: a line mentioning both
+# "skills" and "role" is a roles header, as before.
+SECTION_HEADER_RE = re.compile(
+    r"^(?:(?=.*?(?P<roles_responsibilities>role|responsibilit))"
+    r"|(?=.*?(?P<skills>skill|qualification|requirement))"
+    r"|(?=.*?(?P<selection_process>selection|interview|process))).*$",
+    re.I | re.M,
+)
+# Digit runs are only tried from their first digit ((?<!\d)); otherwise a
+# long number with no unit after it (IDs, phone numbers, OCR noise) is
+# rescanned from every offset, which is quadratic in its length.
+DESIGNATION_RE = re.compile(r"(job title|designation|role)\s*[:\-]\s*(.*)", re.I)
+EXPERIENCE_RE = re.compile(r"(?<!\d)\d+\+?\s*years?", re.I)
+STIPEND_RE = re.compile(r"[₹$]\s?\d[\d,]*")
+DURATION_RE = re.compile(r"(?<!\d)\d+\s*(months?|weeks?)", re.I)
+OPENINGS_RE = re.compile(r"(?<!\d)\d+\s+(openings|positions|vacancies)", re.I)
+LOCATION_RE = re.compile(r"(location|based at)\s*(?:[:\-]\s*)?(.*)", re.I)
+
+@st.cache_data(show_spinner=False, max_entries=16)
 def rule_extract(text):
-    data = EMPTY_SCHEMA.copy()
+    data = dict(EMPTY_SCHEMA)
     sections = {}
-    current = None
-
-    for line in text.splitlines():
-        l = line.strip()
-        if not l:
-            continue
-
-        if re.search(r"(role|responsibilit)", l, re.I):
-            current = "roles_responsibilities"
-            sections[current] = ""
-        elif re.search(r"(skill|qualification|requirement)", l, re.I):
-            current = "skills"
-            sections[current] = ""
-        elif re.search(r"(selection|interview|process)", l, re.I):
-            current = "selection_process"
-            sections[current] = ""
-        elif current:
-            sections[current] += l + "\n"
+
+    # Each header owns the text up to the next header; text before the
+    # first header belongs to no section. re.M only breaks lines on "\n",
+    # so first normalise every splitlines() boundary (\r, \x0c, \u2028...).
+    lined = "\n".join(text.splitlines())
+    headers = list(SECTION_HEADER_RE.finditer(lined))
+    ends = [h.start() for h in headers[1:]] + [len(lined)]
+    for header, end in zip(headers, ends):
+        lines = lined[header.end():end].split("\n")
+        body = "\n".join(filter(None, map(str.strip, lines)))
+        sections[header.lastgroup] = body + "\n" if body else ""
 
     data.update(sections)
 
-    if m := re.search(r"(job title|designation|role)\s*[:\-]\s*(.*)", text, re.I):
+    if m := DESIGNATION_RE.search(text):
         data["designation"] = m.group(2).strip()
 
-    if m := re.search(r"\d+\+?\s*years?", text, re.I):
+    if m := EXPERIENCE_RE.search(text):
         data["desired_experience"] = m.group(0)
 
-    if m := re.search(r"(₹|\$)\s?\d+[,\d]*", text):
+    if m := STIPEND_RE.search(text):
         data["stipend"] = m.group(0)
 
-    if m := re.search(r"\d+\s*(months?|weeks?)", text, re.I):
+    if m := DURATION_RE.search(text):
         data["internship_duration"] = m.group(0)
 
-    if m := re.search(r"\d+\s+(openings|positions|vacancies)", text, re.I):
+    if m := OPENINGS_RE.search(text):
         data["openings"] = m.group(0)
 
-    if m := re.search(r"(location|based at)\s*[:\-]?\s*(.*)", text, re.I):
+    if m := LOCATION_RE.search(text):
         data["joining_location"] = m.group(2)
 
     return data
@@ -155,49 +310,148 @@ SKILL_MAP = {
     "Data Analysis": ["data analysis", "analytics"],
 }
 
-def normalize_skills(text):
-    found = set()
-    lower = text.lower()
-    for canon, variants in SKILL_MAP.items():
+# One automaton over every variant: a single pass over the text finds all
+# of them, however large SKILL_MAP grows. Streamlit re-executes this script
+# on every rerun, so the build is kept per process (and per map contents).
+@st.cache_resource
+def skill_automaton(skill_map):
+    automaton = ahocorasick.Automaton()
+    for canon, variants in skill_map.items():
         for v in variants:
-            if v in lower:
-                found.add(canon)
+            automaton.add_word(v, canon)
+    automaton.make_automaton()
+    return automaton
+
+def normalize_skills(text):
+    automaton = skill_automaton(SKILL_MAP)
+    found = {canon for _, canon in automaton.iter(text.lower())}
     return ", ".join(sorted(found))
 
 # =====================================================
 # LLM FILL ONLY BLANK FIELDS
 # =====================================================
+# Cheap second-chance patterns for fields the primary rules leave blank;
+# every field filled here is one the LLM no longer has to generate.
+MONTHS = (
+    r"Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?"
+    r"|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?"
+)
+FIELD_PATTERNS = {
+    "official_website": re.compile(r"((?:https?://|www\.)[^\s,;]*[^\s,;.)])", re.I),
+    "preferred_education": re.compile(
+        r"(?<![\w.])(B\.?\s?Tech|M\.?\s?Tech|B\.E\.|B\.?Sc|M\.?Sc|BCA|MCA|MBA|Ph\.?D)(?!\w)"
+    ),
+    # Only a labelled value, and month names are case-sensitive: a bare
+    # "joining ... may" in prose is a verb, not May.
+    "joining_month": re.compile(
+        r"(?i:\b(?:joining\s+(?:month|date)|date\s+of\s+joining))\s*[:\-]?\s*"
+        rf"((?:{MONTHS})\b(?:[ ,]+\d{{4}})?)"
+    ),
+}
+
+LLM_MAX_INPUT_TOKENS = 2048
+LLM_INSTRUCTIONS = """
+Fill ONLY the missing fields below.
+Do not modify existing values.
+Answer ONLY with "field: value" pairs separated by semicolons.
+"""
+
+# The instructions never change: tokenize them once per process and prepend
+# the ids, instead of re-running the tokenizer over them on every call.
+@st.cache_resource
+def prompt_prefix_ids():
+    tokenizer, _ = load_llm()
+    return tokenizer(
+        LLM_INSTRUCTIONS, add_special_tokens=False, return_tensors="pt"
+    ).input_ids
+
+# Encoder cost grows quadratically with prompt length, so the LLM only sees
+# the opening of the JD (company, title) plus a window around each header.
+CONTEXT_HEAD = 500
+CONTEXT_RADIUS = 500
+
+def llm_context(raw_text):
+    headers = list(SECTION_HEADER_RE.finditer(raw_text))
+    if not headers:
+        return raw_text
+
+    spans = [(0, CONTEXT_HEAD)]
+    for h in headers:
+        start = max(0, h.start() - CONTEXT_RADIUS)
+        end = h.start() + CONTEXT_RADIUS
+        if start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return "\n...\n".join(raw_text[start:end] for start, end in spans)
+
+# flan-t5's vocabulary has no braces or newlines, so it cannot emit JSON.
+# It answers "field: value; field: value" instead, split on the schema keys
+# (all of them, so an echoed existing field doesn't run into its neighbour).
+LLM_FIELD_RE = re.compile(
+    rf"\b({'|'.join(map(re.escape, FIELD_KEYS.values()))})\s*[:=]\s*"
+)
+
+def parse_llm_fields(decoded):
+    parts = LLM_FIELD_RE.split(decoded)
+    filled = {}
+    for key, value in zip(parts[1::2], parts[2::2]):
+        value = value.strip(" ;,")
+        if value and key not in filled:
+            filled[key] = value
+    return filled
+
+@st.cache_data(show_spinner=False, max_entries=16)
 def llm_fill_missing(raw_text, data):
+    # Nothing to read (e.g. a scan OCR could not decode): skip the model.
+    if not raw_text.strip():
+        return data
+
     missing = [k for k, v in data.items() if not v.strip()]
+
+    for k in missing:
+        if k in FIELD_PATTERNS and (m := FIELD_PATTERNS[k].search(raw_text)):
+            data[k] = m.group(1).strip()
+
+    missing = [k for k in missing if not data[k]]
     if not missing:
         return data
 
     prompt = f"""
-Fill ONLY the missing fields below.
-Do not modify existing values.
-Return ONLY valid JSON.
-
 Missing fields:
-{missing}
+{", ".join(missing)}
 
 Job Description:
-{raw_text}
+{llm_context(raw_text)}
 
 Current data:
-{json.dumps(data)}
+{"; ".join(f"{k}: {v}" for k, v in data.items() if v)}
 """
 
-    inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=2048)
-    outputs = llm_model.generate(**inputs, max_new_tokens=512)
+    tokenizer, llm_model = load_llm()
+    prefix_ids = prompt_prefix_ids()
+    prompt_ids = tokenizer(
+        prompt,
+        return_tensors="pt",
+        truncation=True,
+        max_length=LLM_MAX_INPUT_TOKENS - prefix_ids.shape[1],
+    ).input_ids
+    input_ids = torch.cat([prefix_ids, prompt_ids], dim=1).to(llm_model.device)
+    with torch.inference_mode():
+        outputs = llm_model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            max_new_tokens=200,
+            num_beams=1,
+            do_sample=False,
+            use_cache=True,
+        )
     decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
 
-    try:
-        filled = json.loads(decoded)
-        for k in missing:
-            if k in filled and filled[k]:
-                data[k] = filled[k]
-    except:
-        pass
+    filled = parse_llm_fields(decoded)
+    for k in missing:
+        if k in filled:
+            data[k] = filled[k]
 
     return data
 
@@ -207,54 +461,76 @@ Current data:
 def confidence_score(value):
     if not value:
         return 0.0
-    if len(value.split()) > 20:
+    # Only thresholds matter, so stop splitting after 21 words.
+    words = len(value.split(maxsplit=20))
+    if words > 20:
         return 0.9
-    if len(value.split()) > 5:
+    if words > 5:
         return 0.7
     return 0.5
 
 # =====================================================
 # PDF GENERATION
 # =====================================================
+# Styles are immutable configuration, so build them once rather than per render
+LABEL_BLUE = colors.HexColor("#2e74b5")
+LEFT_STYLE = ParagraphStyle("left", fontSize=8, textColor=colors.white)
+RIGHT_STYLE = ParagraphStyle("right", fontSize=8)
+LABEL_COL_WIDTH = 170
+VALUE_COL_WIDTH = 340
+CELL_PADDING = 6
+TABLE_STYLE = TableStyle([
+    ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
+    ("BACKGROUND", (0,0), (0,-1), LABEL_BLUE),
+    ("VALIGN", (0,0), (-1,-1), "TOP"),
+    ("PADDING", (0,0), (-1,-1), CELL_PADDING),
+    # plain-string value cells render with the same font as RIGHT_STYLE
+    ("FONTNAME", (1,0), (1,-1), RIGHT_STYLE.fontName),
+    ("FONTSIZE", (1,0), (1,-1), RIGHT_STYLE.fontSize),
+    ("LEADING", (1,0), (1,-1), RIGHT_STYLE.leading),
+])
+
+# A Paragraph re-parses its markup and reflows on every build. Table cells
+# don't wrap plain strings, so only single-line values that fit the column
+# can skip it; anything longer still gets a Paragraph.
+def value_cell(value):
+    width = stringWidth(value, RIGHT_STYLE.fontName, RIGHT_STYLE.fontSize)
+    if "\n" not in value and width <= VALUE_COL_WIDTH - 2 * CELL_PADDING:
+        return value
+    return Paragraph(value.replace("\n", "<br/>"), RIGHT_STYLE)
+
+# Every keystroke in the review form reruns the script and re-renders the
+# download; identical field values reuse the last rendered PDF.
+@st.cache_data(show_spinner=False, max_entries=16)
 def generate_pdf(data):
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
 
-    left = ParagraphStyle("left", fontSize=8, textColor=colors.white)
-    right = ParagraphStyle("right", fontSize=8)
-
-    table_data = []
-
-    for label in TEMPLATE_FIELDS:
-        key = FIELD_KEYS[label]
-        table_data.append([
-            Paragraph(label, left),
-            Paragraph(data.get(key, "").replace("\n", "<br/>"), right)
-        ])
+    # Flowables are mutable (wrapOn/drawOn set and delete .canv), so label
+    # Paragraphs are built per render, never shared between sessions.
+    table_data = [
+        [Paragraph(label, LEFT_STYLE), value_cell(data.get(key, ""))]
+        for label, key in FIELD_PAIRS
+    ]
 
-    table = Table(table_data, colWidths=[170, 340])
-    table.setStyle(TableStyle([
-        ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
-        ("BACKGROUND", (0,0), (0,-1), colors.HexColor("#2e74b5")),
-        ("VALIGN", (0,0), (-1,-1), "TOP"),
-        ("PADDING", (0,0), (-1,-1), 6),
-    ]))
+    table = Table(table_data, colWidths=[LABEL_COL_WIDTH, VALUE_COL_WIDTH])
+    table.setStyle(TABLE_STYLE)
 
     doc.build([table])
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
 
 # =====================================================
 # DOCX GENERATION
 # =====================================================
+# Same rerun-per-keystroke cost as the PDF, so the same memoization
+@st.cache_data(show_spinner=False, max_entries=16)
 def generate_docx(data):
     document = docx.Document()
     style = document.styles["Normal"]
     style.font.name = "Arial"
     style.font.size = docx.shared.Pt(10)
 
-    for label in TEMPLATE_FIELDS:
-        key = FIELD_KEYS[label]
+    for label, key in FIELD_PAIRS:
         p = document.add_paragraph()
         run = p.add_run(f"{label}:\n")
         run.bold = True
@@ -262,8 +538,7 @@ def generate_docx(data):
 
     buf = io.BytesIO()
     document.save(buf)
-    buf.seek(0)
-    return buf
+    return buf.getvalue()
 
 # =====================================================
 # STREAMLIT UI
@@ -276,7 +551,7 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file:
-    raw_text = extract_text(uploaded_file)
+    raw_text = extract_text(uploaded_file.getvalue(), uploaded_file.type)
 
     st.subheader("OCR / Extracted Text")
     st.text_area("Extracted Content", raw_text, height=250)
@@ -297,9 +572,8 @@ if "data" in st.session_state:
     st.subheader("Review & Edit")
 
     edited = {}
-    for label in TEMPLATE_FIELDS:
-        key = FIELD_KEYS[label]
-        if label in ["Roles & Responsibilities", "Skills", "Selection Process"]:
+    for label, key in FIELD_PAIRS:
+        if label in MULTILINE_FIELDS:
             edited[key] = st.text_area(label, st.session_state["data"].get(key, ""), height=120)
         else:
             edited[key] = st.text_input(label, st.session_state["data"].get(key, ""))